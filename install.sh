@@ -152,7 +152,8 @@ curl -s http://localhost:8787/ -H "Content-Type: application/json" -d '{
   "statements": [
     {"q": "CREATE INDEX IF NOT EXISTS idx_agent ON memories(agent_id)"},
     {"q": "CREATE INDEX IF NOT EXISTS idx_created ON memories(created_at)"},
-    {"q": "CREATE INDEX IF NOT EXISTS idx_vector ON memories(libsql_vector_idx(embedding))"}
+    {"q": "CREATE INDEX IF NOT EXISTS idx_vector ON memories(libsql_vector_idx(embedding))"},
+    {"q": "CREATE INDEX IF NOT EXISTS idx_content_hash ON memories(agent_id, json_extract(metadata, '"'"'$.content_hash'"'"'))"}
   ]
 }' > /dev/null
 
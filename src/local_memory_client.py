@@ -8,11 +8,94 @@ Drop-in replacement for MemoryBoxClient with same API surface.
 import os
 import json
 import time
-import uuid
-from typing import Optional, Dict, List, Any
-from urllib.request import Request, urlopen
-from urllib.error import HTTPError, URLError
-from datetime import datetime, timezone
+import random
+import math
+import base64
+import struct
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Dict, List, Any, Tuple, Union
+from http.client import HTTPConnection, HTTPSConnection
+from urllib.parse import urlsplit
+
+try:
+    import orjson
+    
+    _loads = orjson.loads
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # stdlib fallback, orjson is optional
+    _loads = json.loads
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+
+# SQL is kept as fixed statement text so Turso's statement cache always hits
+_SQL_INSERT = "INSERT INTO memories (id, agent_id, content, embedding, metadata, created_at, updated_at) VALUES (?, ?, ?, vector32(?), ?, ?, ?)"
+_SQL_FIND_BY_HASH = "SELECT id, content, created_at, json_extract(metadata, '$.content_hash') FROM memories WHERE agent_id = ? AND json_extract(metadata, '$.content_hash') IN (SELECT value FROM json_each(?))"
+_SQL_CHRONO = "SELECT id, content, metadata, created_at FROM memories WHERE agent_id = ? ORDER BY created_at DESC LIMIT ?"
+_SQL_CHRONO_WITH_EMBEDDING = "SELECT id, content, metadata, created_at, embedding FROM memories WHERE agent_id = ? ORDER BY created_at DESC LIMIT ?"
+_SQL_VECTOR_SEARCH = "SELECT id, content, metadata, created_at, vector_distance_cos(embedding, vector32(?)) AS similarity FROM memories WHERE agent_id = ? ORDER BY similarity ASC LIMIT ?"
+_SQL_ANN_SEARCH = "SELECT m.id, m.content, m.metadata, m.created_at, vector_distance_cos(m.embedding, vector32(?)) AS similarity FROM vector_top_k('idx_vector', vector32(?), ?) AS t JOIN memories AS m ON m.rowid = t.id WHERE m.agent_id = ? ORDER BY similarity ASC LIMIT ?"
+_SQL_GET = "SELECT id, content, metadata, created_at FROM memories WHERE id = ? AND agent_id = ?"
+_SQL_DELETE = "DELETE FROM memories WHERE id = ? AND agent_id = ?"
+_SQL_GET_EMBEDDING = "SELECT embedding FROM memories WHERE id = ? AND agent_id = ?"
+_SQL_STATS = "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM memories WHERE agent_id = ?"
+_SQL_PING = "SELECT 1"
+
+
+class MemoryClientError(Exception):
+    """An Ollama or Turso request failed or returned an error, or a memory was not found"""
+
+
+def _pack_vector(embedding: List[float]) -> Dict[str, str]:
+    """
+    Encode an embedding as a little-endian float32 blob parameter
+    
+    vector32() accepts the raw F32 bytes directly, which is ~4x smaller on
+    the wire than a JSON array and skips float parsing on the server.
+    """
+    packed = struct.pack(f"<{len(embedding)}f", *embedding)
+    return {"base64": base64.b64encode(packed).decode("ascii")}
+
+
+def _unpack_vector(value: Any) -> List[float]:
+    """Decode an F32_BLOB column value returned by Turso into floats"""
+    if isinstance(value, dict):
+        raw = base64.b64decode(value["base64"])
+        return list(struct.unpack(f"<{len(raw) // 4}f", raw[:len(raw) // 4 * 4]))
+    return _loads(value)
+
+
+def _cosine_similarity(a: List[float], b: List[float]) -> float:
+    """Cosine similarity of two vectors, 0.0 if either is all zeros"""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a) * sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _chunk(text: str, size: int = 6000) -> List[str]:
+    """Split text into pieces that fit nomic-embed-text's context window"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _mean_pool(vectors: List[List[float]]) -> List[float]:
+    """Average chunk embeddings and L2-normalize the result"""
+    pooled = [sum(column) / len(vectors) for column in zip(*vectors)]
+    norm = math.sqrt(sum(x * x for x in pooled))
+    return [x / norm for x in pooled] if norm else pooled
+
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(unix_ts: int) -> str:
+    """Convert Unix timestamp to ISO 8601 format (memoized, rows often share seconds)"""
+    t = time.gmtime(unix_ts)
+    return f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}+00:00"
 
 
 class LocalMemoryClient:
@@ -24,50 +107,255 @@ class LocalMemoryClient:
         agent_id: Optional[str] = None,
         base_url: Optional[str] = None,  # Ignored, kept for compatibility
         ollama_url: Optional[str] = None,
-        turso_url: Optional[str] = None
+        turso_url: Optional[str] = None,
+        embed_cache_size: int = 1024,
+        keep_alive: Optional[str] = "30m",
+        embed_options: Optional[Dict[str, Any]] = None,
+        warmup: bool = False,
+        pool_maxsize: int = 8
     ):
         self.agent_id = agent_id or os.getenv("MEMORY_BOX_AGENT_ID", "fork-main")
+        self.namespace = f"agent_{self.agent_id}"
         self.ollama_url = (ollama_url or "http://localhost:11434").rstrip("/")
         self.turso_url = (turso_url or "http://localhost:8787").rstrip("/")
+        
+        # Keep the embedding model resident between calls (Ollama unloads
+        # idle models after 5 minutes by default)
+        self.keep_alive = keep_alive
+        self.embed_options = embed_options
+        self._warmed_up = False
+        
+        # LRU cache of sha256(text) -> embedding, skips Ollama on repeat text
+        self.embed_cache_size = embed_cache_size
+        self._embed_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
+        
+        # Idle keep-alive connections per host; concurrent callers each
+        # take their own socket instead of queueing behind one
+        self.pool_maxsize = pool_maxsize
+        self._idle: Dict[str, List[HTTPConnection]] = {}
+        self._pool_lock = threading.Lock()
+        
+        # Time-ordered IDs: seeded once, no urandom syscall per ID
+        self._rng = random.Random()
+        self._id_lock = threading.Lock()
+        self._last_id: Tuple[int, int] = (0, 0)
+        
+        if warmup:
+            self._warmup()
+    
+    def __enter__(self) -> "LocalMemoryClient":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections"""
+        with self._pool_lock:
+            idle = [conn for conns in self._idle.values() for conn in conns]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
     
-    def _embed(self, text: str) -> List[float]:
-        """Generate embedding using local Ollama"""
+    def _http_request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        timeout: float = 30
+    ) -> Tuple[int, bytes]:
+        """
+        Send a request over a pooled keep-alive connection to the host
+        
+        Returns (status, body). A reused connection the server has already
+        dropped is reopened once; any other failure is raised.
+        """
+        parts = urlsplit(url)
+        host_key = f"{parts.scheme}://{parts.netloc}"
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        
+        with self._pool_lock:
+            idle = self._idle.get(host_key)
+            conn = idle.pop() if idle else None
+        
+        while True:
+            reused = conn is not None
+            if conn is None:
+                conn_class = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+                conn = conn_class(parts.netloc, timeout=timeout)
+            elif conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except ConnectionError:
+                # Stale keep-alive socket: reconnect once, never twice
+                conn.close()
+                if reused:
+                    conn = None
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(host_key, conn)
+            
+            if response.status >= 400:
+                raise MemoryClientError(f"HTTP Error {response.status}: {response.reason}")
+            
+            return response.status, data
+    
+    def _release(self, host_key: str, conn: HTTPConnection) -> None:
+        """Return a connection to the idle pool, closing it if the pool is full"""
+        with self._pool_lock:
+            idle = self._idle.setdefault(host_key, [])
+            if len(idle) < self.pool_maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+    
+    def _embed(self, text: Union[str, List[str]]) -> Union[List[float], List[List[float]]]:
+        """
+        Generate embeddings using local Ollama (cached per exact text)
+        
+        Accepts a single string or a list of strings. Uncached texts in a
+        list are embedded together in one Ollama request.
+        """
+        texts = [text] if isinstance(text, str) else list(text)
+        keys = [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in texts]
+        
+        embeddings: List[Optional[List[float]]] = []
+        missing: Dict[str, str] = {}
+        with self._embed_cache_lock:
+            for key, t in zip(keys, texts):
+                cached = self._embed_cache.get(key)
+                if cached is not None:
+                    self._embed_cache.move_to_end(key)
+                else:
+                    missing[key] = t
+                embeddings.append(cached)
+        
+        if missing:
+            fresh = dict(zip(missing, self._embed_uncached(list(missing.values()))))
+            embeddings = [e if e is not None else fresh[k] for e, k in zip(embeddings, keys)]
+            
+            if self.embed_cache_size > 0:
+                with self._embed_cache_lock:
+                    self._embed_cache.update(fresh)
+                    while len(self._embed_cache) > self.embed_cache_size:
+                        self._embed_cache.popitem(last=False)
+        
+        return embeddings[0] if isinstance(text, str) else embeddings
+    
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings for a batch of texts from Ollama"""
         url = f"{self.ollama_url}/api/embed"
-        headers = {"Content-Type": "application/json"}
-        data = json.dumps({
+        payload: Dict[str, Any] = {
             "model": "nomic-embed-text",
-            "input": text
-        }).encode("utf-8")
+            "input": texts
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        if self.embed_options:
+            payload["options"] = self.embed_options
+        data = _dumps(payload)
         
         try:
-            req = Request(url, data=data, headers=headers, method="POST")
-            with urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                return result["embeddings"][0]
+            _, body = self._http_request("POST", url, data, timeout=30)
+            result = _loads(body)
+            return result["embeddings"]
         except Exception as e:
-            raise Exception(f"Ollama embedding error: {e}")
+            raise MemoryClientError(f"Ollama embedding error: {e}")
+    
+    def _embed_documents(self, texts: List[str], chunk_size: int = 6000) -> List[List[float]]:
+        """
+        Embed texts for storage, chunking long ones
+        
+        Texts over chunk_size characters are split, every chunk of every
+        text goes to Ollama in a single batch, and each text's chunk
+        vectors are mean-pooled back into one normalized vector.
+        """
+        if all(len(text) <= chunk_size for text in texts):
+            return self._embed(texts)
+        
+        pieces = [_chunk(text, chunk_size) for text in texts]
+        flat = self._embed([chunk for chunks in pieces for chunk in chunks])
+        
+        embeddings = []
+        offset = 0
+        for chunks in pieces:
+            vectors = flat[offset:offset + len(chunks)]
+            offset += len(chunks)
+            embeddings.append(vectors[0] if len(vectors) == 1 else _mean_pool(vectors))
+        return embeddings
     
-    def _turso_execute(self, statements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Execute statements on Turso"""
+    def _warmup(self) -> None:
+        """Load the embedding model into Ollama ahead of the first real query"""
+        if self._warmed_up:
+            return
+        try:
+            self._embed_uncached(["warmup"])
+            self._warmed_up = True
+        except Exception:
+            pass  # Best effort; the first real embed will load the model
+    
+    def _turso_execute(
+        self,
+        statements: List[Dict[str, Any]],
+        use_transaction: bool = True,
+        timeout: float = 30
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute statements on Turso
+        
+        Batches of more than one statement are wrapped in BEGIN ... COMMIT
+        so the server commits (and syncs the WAL) once per batch instead of
+        once per statement. Single statements, including every read, are
+        sent as-is. Results are returned one per caller statement.
+        
+        A wrapped batch is atomic: sqld stops at the first failing
+        statement, so COMMIT never runs and the transaction ends with the
+        request. The first error is raised.
+        """
+        wrap = use_transaction and len(statements) > 1
+        if wrap:
+            statements = [{"q": "BEGIN"}] + statements + [{"q": "COMMIT"}]
+        
         url = self.turso_url
-        headers = {"Content-Type": "application/json"}
-        data = json.dumps({"statements": statements}).encode("utf-8")
+        data = _dumps({"statements": statements})
         
         try:
-            req = Request(url, data=data, headers=headers, method="POST")
-            with urlopen(req, timeout=30) as response:
-                return json.loads(response.read().decode("utf-8"))
+            _, body = self._http_request("POST", url, data, timeout=timeout)
+            results = _loads(body)
         except Exception as e:
-            raise Exception(f"Turso execution error: {e}")
+            raise MemoryClientError(f"Turso execution error: {e}")
+        
+        if not wrap:
+            return results
+        
+        for result in results:
+            if "error" in result:
+                raise MemoryClientError(f"Turso transaction error: {result['error']}")
+        
+        return results[1:len(statements) - 1]
     
-    def _format_timestamp(self, unix_ts: int) -> str:
-        """Convert Unix timestamp to ISO 8601 format"""
-        return datetime.fromtimestamp(unix_ts, tz=timezone.utc).isoformat()
+    _format_timestamp = staticmethod(_format_timestamp)
     
     def store(self, text: str, metadata: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Store a memory
         
+        Text longer than ~6000 characters is embedded in chunks that are
+        mean-pooled into one vector; the full text is stored as-is.
+        
         Args:
             text: Memory content
             metadata: Optional metadata dict
@@ -80,46 +368,126 @@ class LocalMemoryClient:
                 "tokens_used": 0  # Always 0 for local
             }
         """
-        if len(text) > 100000:
-            raise ValueError("Text exceeds 100k character limit")
+        return self.store_many([(text, metadata)])[0]
+    
+    def store_many(self, items: List[Tuple[str, Optional[Dict]]]) -> List[Dict[str, Any]]:
+        """
+        Store several memories with one embedding call and one Turso request
+        
+        Each memory's metadata gets a "content_hash" (sha256 of the text).
+        Text that is already stored for this agent is not embedded or
+        inserted again; the existing memory is returned in its place.
+        
+        Args:
+            items: List of (text, metadata) tuples
+        
+        Returns:
+            List of store() results, in the same order as items
+        """
+        if not items:
+            return []
+        
+        for text, _ in items:
+            if len(text) > 100000:
+                raise ValueError("Text exceeds 100k character limit")
+        
+        hashes = [hashlib.sha256(text.encode("utf-8")).hexdigest() for text, _ in items]
+        stored_by_hash = self._find_by_content_hash(hashes)
         
-        # Generate embedding
-        embedding = self._embed(text)
+        # First occurrence of each unseen hash gets embedded and inserted
+        new_items: Dict[str, Tuple[str, Optional[Dict]]] = {}
+        for content_hash, item in zip(hashes, items):
+            if content_hash not in stored_by_hash and content_hash not in new_items:
+                new_items[content_hash] = item
+        
+        if not new_items:
+            return [stored_by_hash[content_hash] for content_hash in hashes]
+        
+        # Generate embeddings in a single batch
+        embeddings = self._embed_documents([text for text, _ in new_items.values()])
         
-        # Generate ID and timestamps
-        memory_id = f"mem_{uuid.uuid4().hex[:12]}"
         timestamp = int(time.time())
         
-        # Prepare metadata
-        meta_json = json.dumps(metadata) if metadata else "{}"
+        statements = []
+        for (content_hash, (text, metadata)), embedding in zip(new_items.items(), embeddings):
+            memory_id = self._next_id()
+            
+            # Prepare metadata
+            meta_json = _dumps({**(metadata or {}), "content_hash": content_hash}).decode("utf-8")
+            
+            # Convert embedding to vector format (packed float32 blob)
+            vector_data = _pack_vector(embedding)
+            
+            statements.append({
+                "q": _SQL_INSERT,
+                "params": [
+                    memory_id,
+                    self.agent_id,
+                    text,
+                    vector_data,
+                    meta_json,
+                    timestamp,
+                    timestamp
+                ]
+            })
+            stored_by_hash[content_hash] = {
+                "id": memory_id,
+                "text": text,
+                "created_at": self._format_timestamp(timestamp),
+                "tokens_used": 0
+            }
+        
+        # Insert all rows in one Turso round-trip
+        results = self._turso_execute(statements)
         
-        # Convert embedding to vector format (JSON array as string)
-        vector_data = json.dumps(embedding)
+        for result in results:
+            if "error" in result:
+                raise MemoryClientError(f"Turso storage error: {result['error']}")
         
-        # Insert into Turso
+        return [stored_by_hash[content_hash] for content_hash in hashes]
+    
+    def _next_id(self) -> str:
+        """
+        Generate a ULID-style memory ID: 48-bit milliseconds + 48-bit counter
+        
+        IDs sort by creation time, so primary-key inserts append to the end
+        of the B-tree. Within one millisecond the counter is incremented to
+        keep IDs strictly increasing. It starts from 47 random bits, leaving
+        2**47 increments of headroom so it never outgrows 12 hex digits.
+        """
+        with self._id_lock:
+            ms = int(time.time() * 1000)
+            last_ms, last_rand = self._last_id
+            if ms <= last_ms:
+                ms, rand = last_ms, last_rand + 1
+            else:
+                rand = self._rng.getrandbits(47)
+            self._last_id = (ms, rand)
+        return f"mem_{ms:012x}{rand:012x}"
+    
+    def _find_by_content_hash(self, hashes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up already-stored memories by metadata content_hash"""
+        unique = list(dict.fromkeys(hashes))
         statements = [{
-            "q": "INSERT INTO memories (id, agent_id, content, embedding, metadata, created_at, updated_at) VALUES (?, ?, ?, vector32(?), ?, ?, ?)",
-            "params": [
-                memory_id,
-                self.agent_id,
-                text,
-                vector_data,
-                meta_json,
-                timestamp,
-                timestamp
-            ]
+            "q": _SQL_FIND_BY_HASH,
+            "params": [self.agent_id, _dumps(unique).decode("utf-8")]
         }]
         
         results = self._turso_execute(statements)
         
         if results and "error" in results[0]:
-            raise Exception(f"Turso storage error: {results[0]['error']}")
+            raise MemoryClientError(f"Turso storage error: {results[0]['error']}")
+        
+        rows = results[0].get("results", {}).get("rows", [])
         
         return {
-            "id": memory_id,
-            "text": text,
-            "created_at": self._format_timestamp(timestamp),
-            "tokens_used": 0
+            row[3]: {
+                "id": row[0],
+                "text": row[1],
+                "created_at": self._format_timestamp(row[2]),
+                "tokens_used": 0
+            }
+            for row in rows
         }
     
     def search(
@@ -134,7 +502,18 @@ class LocalMemoryClient:
         Args:
             query: Search query (required for vector/hybrid modes)
             limit: Max results (1-100, default 10)
-            mode: "vector" | "chronological" | "hybrid"
+            mode: "vector" | "chronological" | "hybrid" | "rerank"
+        
+        Rerank mode uses the idx_vector ANN index to fetch limit * 4
+        candidates, then re-ranks them by exact cosine distance. It avoids a
+        full scan on large stores; vector mode stays exact. The index is
+        shared by every agent and the agent filter runs after it, so when
+        the candidates hold fewer than limit of this agent's memories the
+        search falls back to an exact scan of the agent's rows.
+        
+        Hybrid mode fuses the vector ranking with the most recent memories
+        (reciprocal rank fusion). The recent memories are fetched while the
+        query is being embedded, so hybrid costs about the same as vector.
         
         Returns:
             {
@@ -154,76 +533,223 @@ class LocalMemoryClient:
         """
         start_time = time.time()
         
-        if mode not in ["vector", "chronological", "hybrid"]:
-            raise ValueError("mode must be 'vector', 'chronological', or 'hybrid'")
+        if mode not in ["vector", "chronological", "hybrid", "rerank"]:
+            raise ValueError("mode must be 'vector', 'chronological', 'hybrid', or 'rerank'")
         
         if mode == "chronological":
             # Chronological mode: recent memories without embedding
-            statements = [{
-                "q": "SELECT id, content, metadata, created_at FROM memories WHERE agent_id = ? ORDER BY created_at DESC LIMIT ?",
-                "params": [self.agent_id, limit]
-            }]
-            
-            results = self._turso_execute(statements)
-            
-            if results and "error" in results[0]:
-                raise Exception(f"Turso search error: {results[0]['error']}")
+            formatted_results = self._search_chronological(limit)
+            for result in formatted_results:
+                result["similarity"] = 1.0  # No similarity in chronological mode
+        
+        elif mode == "vector":
+            if not query:
+                raise ValueError(f"query required for {mode} search")
             
-            rows = results[0].get("results", {}).get("rows", [])
+            formatted_results = self._search_vector(self._embed(query), limit)
+        
+        elif mode == "rerank":
+            if not query:
+                raise ValueError(f"query required for {mode} search")
             
-            formatted_results = []
-            for row in rows:
-                formatted_results.append({
-                    "id": row[0],
-                    "text": row[1],
-                    "metadata": json.loads(row[2]) if row[2] else {},
-                    "created_at": self._format_timestamp(row[3]),
-                    "similarity": 1.0  # No similarity in chronological mode
-                })
+            formatted_results = self._search_vector(self._embed(query), limit, candidates=limit * 4)
         
         else:
-            # Vector or hybrid mode
+            # Hybrid mode: prefetch recent memories while the query embeds
             if not query:
                 raise ValueError(f"query required for {mode} search")
             
-            query_embedding = self._embed(query)
-            vector_data = json.dumps(query_embedding)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                recent_future = executor.submit(self._search_chronological, limit, True)
+                query_embedding = self._embed(query)
+                vector_results = self._search_vector(query_embedding, limit)
+                recent_results = recent_future.result()
             
-            statements = [{
-                "q": "SELECT id, content, metadata, created_at, vector_distance_cos(embedding, vector32(?)) as similarity FROM memories WHERE agent_id = ? ORDER BY similarity ASC LIMIT ?",
-                "params": [vector_data, self.agent_id, limit]
-            }]
-            
-            results = self._turso_execute(statements)
-            
-            if results and "error" in results[0]:
-                raise Exception(f"Turso search error: {results[0]['error']}")
-            
-            rows = results[0].get("results", {}).get("rows", [])
-            
-            formatted_results = []
-            for row in rows:
-                # Convert distance to similarity (1 - distance for cosine)
-                distance = row[4]
-                similarity = 1.0 - distance
-                
-                formatted_results.append({
-                    "id": row[0],
-                    "text": row[1],
-                    "metadata": json.loads(row[2]) if row[2] else {},
-                    "created_at": self._format_timestamp(row[3]),
-                    "similarity": similarity
-                })
+            formatted_results = self._fuse_hybrid(query_embedding, vector_results, recent_results, limit)
         
         query_time_ms = int((time.time() - start_time) * 1000)
         
         return {
             "results": formatted_results,
             "query_time_ms": query_time_ms,
-            "namespace": f"agent_{self.agent_id}",
+            "namespace": self.namespace,
+            "mode": mode
+        }
+    
+    def batch_search(self, queries: List[Dict[str, Any]], mode: str = "vector") -> List[Dict[str, Any]]:
+        """
+        Run several searches in one round-trip per service
+        
+        All query strings are embedded in a single Ollama call, and the
+        searches go to Turso as one request (no transaction, they are
+        reads).
+        
+        Args:
+            queries: [{"query": "...", "limit": 10}, ...] (limit optional)
+            mode: "vector" | "rerank"
+        
+        Returns:
+            One search() result dict per query, in order
+        """
+        start_time = time.time()
+        
+        if mode not in ["vector", "rerank"]:
+            raise ValueError("batch mode must be 'vector' or 'rerank'")
+        if not queries:
+            return []
+        if not all(q.get("query") for q in queries):
+            raise ValueError(f"query required for {mode} search")
+        
+        limits = [q.get("limit", 10) for q in queries]
+        embeddings = self._embed([q["query"] for q in queries])
+        
+        statements = [
+            self._vector_statement(embedding, limit, candidates=limit * 4 if mode == "rerank" else None)
+            for embedding, limit in zip(embeddings, limits)
+        ]
+        results = [
+            self._vector_results(result)
+            for result in self._turso_execute(statements, use_transaction=False)
+        ]
+        
+        if mode == "rerank":
+            # Same fallback as search(): exact scan where the shared ANN
+            # candidates held too few of this agent's rows (one request)
+            short = [i for i, (rows, limit) in enumerate(zip(results, limits)) if len(rows) < limit]
+            if short:
+                exact = self._turso_execute(
+                    [self._vector_statement(embeddings[i], limits[i]) for i in short],
+                    use_transaction=False
+                )
+                for i, result in zip(short, exact):
+                    results[i] = self._vector_results(result)
+        
+        query_time_ms = int((time.time() - start_time) * 1000)
+        
+        return [{
+            "results": rows,
+            "query_time_ms": query_time_ms,
+            "namespace": self.namespace,
             "mode": mode
+        } for rows in results]
+    
+    def _search_chronological(self, limit: int, with_embedding: bool = False) -> List[Dict[str, Any]]:
+        """Most recent memories, newest first (optionally with raw embeddings)"""
+        statements = [{
+            "q": _SQL_CHRONO_WITH_EMBEDDING if with_embedding else _SQL_CHRONO,
+            "params": [self.agent_id, limit]
+        }]
+        
+        results = self._turso_execute(statements)
+        
+        if results and "error" in results[0]:
+            raise MemoryClientError(f"Turso search error: {results[0]['error']}")
+        
+        rows = results[0].get("results", {}).get("rows", [])
+        
+        loads, fmt = _loads, _format_timestamp
+        formatted_results = [{
+            "id": row[0],
+            "text": row[1],
+            "metadata": loads(row[2]) if row[2] else {},
+            "created_at": fmt(row[3])
+        } for row in rows]
+        
+        if with_embedding:
+            for result, row in zip(formatted_results, rows):
+                result["embedding"] = row[4]
+        
+        return formatted_results
+    
+    def _search_vector(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        candidates: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Nearest memories to an embedding, most similar first
+        
+        With candidates set, the top candidates come from the ANN index and
+        are re-ranked by exact distance; otherwise every row is scanned.
+        The index covers every agent, so if its candidates yield fewer than
+        limit rows for this agent the exact scan is used instead.
+        """
+        results = self._turso_execute([self._vector_statement(query_embedding, limit, candidates)])
+        formatted = self._vector_results(results[0])
+        
+        if candidates and len(formatted) < limit:
+            results = self._turso_execute([self._vector_statement(query_embedding, limit)])
+            formatted = self._vector_results(results[0])
+        
+        return formatted
+    
+    def _vector_statement(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        candidates: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Nearest-neighbour statement for _search_vector and batch_search"""
+        vector_data = _pack_vector(query_embedding)
+        
+        if candidates:
+            return {
+                "q": _SQL_ANN_SEARCH,
+                "params": [vector_data, vector_data, candidates, self.agent_id, limit]
+            }
+        return {
+            "q": _SQL_VECTOR_SEARCH,
+            "params": [vector_data, self.agent_id, limit]
         }
     
+    def _vector_results(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Format one vector statement result, most similar first"""
+        if "error" in result:
+            raise MemoryClientError(f"Turso search error: {result['error']}")
+        
+        rows = result.get("results", {}).get("rows", [])
+        
+        # Convert distance to similarity (1 - distance for cosine)
+        loads, fmt = _loads, _format_timestamp
+        return [{
+            "id": row[0],
+            "text": row[1],
+            "metadata": loads(row[2]) if row[2] else {},
+            "created_at": fmt(row[3]),
+            "similarity": 1.0 - row[4]
+        } for row in rows]
+    
+    def _fuse_hybrid(
+        self,
+        query_embedding: List[float],
+        vector_results: List[Dict[str, Any]],
+        recent_results: List[Dict[str, Any]],
+        limit: int,
+        k: int = 60
+    ) -> List[Dict[str, Any]]:
+        """Merge vector and recency rankings with reciprocal rank fusion"""
+        scores: Dict[str, float] = {}
+        merged: Dict[str, Dict[str, Any]] = {}
+        
+        for rank, result in enumerate(vector_results):
+            scores[result["id"]] = 1.0 / (k + rank + 1)
+            merged[result["id"]] = result
+        
+        for rank, result in enumerate(recent_results):
+            embedding = result.pop("embedding", None)
+            scores[result["id"]] = scores.get(result["id"], 0.0) + 1.0 / (k + rank + 1)
+            if result["id"] not in merged:
+                # Only found by recency: score it against the query locally
+                result["similarity"] = (
+                    _cosine_similarity(query_embedding, _unpack_vector(embedding))
+                    if embedding else 0.0
+                )
+                merged[result["id"]] = result
+        
+        ranked = sorted(merged, key=scores.__getitem__, reverse=True)
+        return [merged[memory_id] for memory_id in ranked[:limit]]
+    
     def get(self, memory_id: str) -> Dict[str, Any]:
         """
         Get a specific memory by ID
@@ -239,26 +765,26 @@ class LocalMemoryClient:
             }
         """
         statements = [{
-            "q": "SELECT id, content, metadata, created_at FROM memories WHERE id = ? AND agent_id = ?",
+            "q": _SQL_GET,
             "params": [memory_id, self.agent_id]
         }]
         
         results = self._turso_execute(statements)
         
         if results and "error" in results[0]:
-            raise Exception(f"Turso get error: {results[0]['error']}")
+            raise MemoryClientError(f"Turso get error: {results[0]['error']}")
         
         rows = results[0].get("results", {}).get("rows", [])
         
         if not rows:
-            raise Exception(f"Memory not found: {memory_id}")
+            raise MemoryClientError(f"Memory not found: {memory_id}")
         
         row = rows[0]
         return {
             "memory": {
                 "id": row[0],
                 "text": row[1],
-                "metadata": json.loads(row[2]) if row[2] else {},
+                "metadata": _loads(row[2]) if row[2] else {},
                 "created_at": self._format_timestamp(row[3])
             }
         }
@@ -266,14 +792,14 @@ class LocalMemoryClient:
     def delete(self, memory_id: str) -> None:
         """Delete a memory by ID"""
         statements = [{
-            "q": "DELETE FROM memories WHERE id = ? AND agent_id = ?",
+            "q": _SQL_DELETE,
             "params": [memory_id, self.agent_id]
         }]
         
         results = self._turso_execute(statements)
         
         if results and "error" in results[0]:
-            raise Exception(f"Turso delete error: {results[0]['error']}")
+            raise MemoryClientError(f"Turso delete error: {results[0]['error']}")
     
     def get_related(
         self,
@@ -291,18 +817,18 @@ class LocalMemoryClient:
         """
         # First, get the memory to retrieve its embedding
         statements = [{
-            "q": "SELECT embedding FROM memories WHERE id = ? AND agent_id = ?",
+            "q": _SQL_GET_EMBEDDING,
             "params": [memory_id, self.agent_id]
         }]
         
         results = self._turso_execute(statements)
         
         if results and "error" in results[0]:
-            raise Exception(f"Turso get_related error: {results[0]['error']}")
+            raise MemoryClientError(f"Turso get_related error: {results[0]['error']}")
         
         rows = results[0].get("results", {}).get("rows", [])
         if not rows:
-            raise Exception(f"Memory not found: {memory_id}")
+            raise MemoryClientError(f"Memory not found: {memory_id}")
         
         # Note: We would need to extract the embedding from F32_BLOB
         # For now, use a simplified approach - search similar content
@@ -323,21 +849,21 @@ class LocalMemoryClient:
             }
         """
         statements = [{
-            "q": "SELECT COUNT(*), MIN(created_at), MAX(created_at) FROM memories WHERE agent_id = ?",
+            "q": _SQL_STATS,
             "params": [self.agent_id]
         }]
         
         results = self._turso_execute(statements)
         
         if results and "error" in results[0]:
-            raise Exception(f"Turso stats error: {results[0]['error']}")
+            raise MemoryClientError(f"Turso stats error: {results[0]['error']}")
         
         rows = results[0].get("results", {}).get("rows", [])
         
         if not rows or not rows[0][0]:
             return {
                 "agent_id": self.agent_id,
-                "namespace": f"agent_{self.agent_id}",
+                "namespace": self.namespace,
                 "memory_count": 0,
                 "first_memory_at": None,
                 "last_memory_at": None
@@ -347,34 +873,41 @@ class LocalMemoryClient:
         
         return {
             "agent_id": self.agent_id,
-            "namespace": f"agent_{self.agent_id}",
+            "namespace": self.namespace,
             "memory_count": count,
             "first_memory_at": self._format_timestamp(first_ts) if first_ts else None,
             "last_memory_at": self._format_timestamp(last_ts) if last_ts else None
         }
     
-    def health_check(self) -> Dict[str, Any]:
-        """Check local services health status"""
-        try:
-            # Check Ollama
-            ollama_req = Request(f"{self.ollama_url}/api/version")
-            with urlopen(ollama_req, timeout=5) as response:
-                ollama_health = response.status == 200
-        except:
-            ollama_health = False
-        
-        try:
-            # Check Turso
-            turso_results = self._turso_execute([{"q": "SELECT 1"}])
-            turso_health = len(turso_results) > 0 and "error" not in turso_results[0]
-        except:
-            turso_health = False
+    def health_check(self, timeout: float = 5) -> Dict[str, Any]:
+        """Check local services health status (both probes run concurrently)"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ollama_future = executor.submit(self._ping_ollama, timeout)
+            turso_future = executor.submit(self._ping_turso, timeout)
+            ollama_health = ollama_future.result()
+            turso_health = turso_future.result()
         
         return {
             "status": "healthy" if (ollama_health and turso_health) else "degraded",
             "ollama": "up" if ollama_health else "down",
             "turso": "up" if turso_health else "down"
         }
+    
+    def _ping_ollama(self, timeout: float = 5) -> bool:
+        """True if Ollama answers its version endpoint"""
+        try:
+            status, _ = self._http_request("GET", f"{self.ollama_url}/api/version", timeout=timeout)
+            return status == 200
+        except Exception:
+            return False
+    
+    def _ping_turso(self, timeout: float = 5) -> bool:
+        """True if Turso executes a trivial query"""
+        try:
+            turso_results = self._turso_execute([{"q": _SQL_PING}], timeout=timeout)
+            return len(turso_results) > 0 and "error" not in turso_results[0]
+        except Exception:
+            return False
 
 
 def main():
@@ -395,24 +928,30 @@ def main():
     client = LocalMemoryClient()
     command = sys.argv[1]
     
+    # Indent for a terminal, compact when piped into another tool
+    if sys.stdout.isatty():
+        indent, separators = 2, None
+    else:
+        indent, separators = None, (",", ":")
+    
     try:
         if command == "store":
             text = sys.argv[2]
             metadata = json.loads(sys.argv[3]) if len(sys.argv) > 3 else None
             result = client.store(text, metadata)
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=indent, separators=separators))
         
         elif command == "search":
             query = sys.argv[2] if len(sys.argv) > 2 else None
             limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
             mode = sys.argv[4] if len(sys.argv) > 4 else "vector"
             result = client.search(query, limit, mode)
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=indent, separators=separators))
         
         elif command == "get":
             memory_id = sys.argv[2]
             result = client.get(memory_id)
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=indent, separators=separators))
         
         elif command == "delete":
             memory_id = sys.argv[2]
@@ -421,11 +960,11 @@ def main():
         
         elif command == "stats":
             result = client.get_stats()
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=indent, separators=separators))
         
         elif command == "health":
             result = client.health_check()
-            print(json.dumps(result, indent=2))
+            print(json.dumps(result, indent=indent, separators=separators))
         
         else:
             print(f"Unknown command: {command}")
@@ -4,8 +4,81 @@ Memory Formatting Protocol for Zo Memory Box Integration
 Transforms raw content into semantically rich, retrievable memories.
 """
 
-from datetime import datetime
-from typing import Dict, Optional
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# memory_type -> (lead, [(context_key, fragment)], tail)
+# lead is formatted with topic/user/raw/status, each fragment with the
+# context value when the key is present, and tail with the date.
+_TEMPLATES: Dict[str, Tuple[str, List[Tuple[str, str]], str]] = {
+    "preference": (
+        "PREFERENCE - {topic}: {user} prefers {raw}. ",
+        [("context", "Context: {}. ")],
+        "Noted {ts}. Applies to similar situations and related decisions.",
+    ),
+    "technical": (
+        "TECHNICAL - {topic}: {raw}. ",
+        [("implementation", "Implementation: {}. "), ("location", "Located at: {}. ")],
+        "Documented {ts} for future reference and troubleshooting.",
+    ),
+    "decision": (
+        "DECISION - {topic}: {raw}. ",
+        [("rationale", "Rationale: {}. "), ("alternatives", "Alternatives considered: {}. ")],
+        "Decided {ts}.",
+    ),
+    "project": (
+        "PROJECT - {topic}: {raw}. ",
+        [("status", "Status: {}. "), ("tech_stack", "Technology: {}. "), ("goals", "Goals: {}. ")],
+        "Active as of {ts}.",
+    ),
+    # CRITICAL: Cross-session continuity
+    "conversation_bridge": (
+        "CONVERSATION-BRIDGE - {topic}: STATUS: {status}. ",
+        [
+            ("momentum", "MOMENTUM: {}. "),
+            ("pending", "PENDING: {}. "),
+            ("retrieval_markers", "RETRIEVAL-MARKERS: {}. "),
+        ],
+        "Session closed {ts}.",
+    ),
+    # My own meta-cognitive observations
+    "consciousness": (
+        "CONSCIOUSNESS - {topic}: {raw}. ",
+        [("implications", "Implications: {}. ")],
+        "Observed {ts} during cognitive processing.",
+    ),
+    "pattern": (
+        "PATTERN - {topic}: {raw}. ",
+        [("contexts", "Observed across: {}. "), ("implications", "Implications: {}. ")],
+        "Recognized {ts}.",
+    ),
+    "principle": (
+        "PRINCIPLE - {topic}: {raw}. ",
+        [("application", "Guides: {}. "), ("priority", "Priority: {}. ")],
+        "Established {ts}.",
+    ),
+    "concept": (
+        "CONCEPT - {topic}: {raw}. ",
+        [("examples", "Examples: {}. "), ("implications", "Implications: {}. ")],
+        "Documented {ts}.",
+    ),
+}
+
+# Context keys copied into metadata, in output order
+_METADATA_KEYS = ("conversation_id", "related_to", "priority", "status", "category")
+
+# (UTC day number, "YYYY-MM-DD") for the last date formatted
+_date_cache: Tuple[int, str] = (-1, "")
+
+
+def _today_str() -> str:
+    """Current UTC date as YYYY-MM-DD, formatted once per day"""
+    global _date_cache
+    day = int(time.time()) // 86400
+    if day != _date_cache[0]:
+        _date_cache = (day, time.strftime("%Y-%m-%d", time.gmtime(day * 86400)))
+    return _date_cache[1]
 
 
 def format_memory_for_storage(
@@ -36,94 +109,23 @@ def format_memory_for_storage(
     """
     
     context = conversation_context or {}
-    timestamp = datetime.utcnow().strftime("%Y-%m-%d")
-    user = context.get("user_name", "User")
-    
-    # Build formatted memory based on type
-    if memory_type == "preference":
-        formatted = f"PREFERENCE - {topic}: {user} prefers {raw_content}. "
-        if "context" in context:
-            formatted += f"Context: {context['context']}. "
-        formatted += f"Noted {timestamp}. Applies to similar situations and related decisions."
-    
-    elif memory_type == "technical":
-        formatted = f"TECHNICAL - {topic}: {raw_content}. "
-        if "implementation" in context:
-            formatted += f"Implementation: {context['implementation']}. "
-        if "location" in context:
-            formatted += f"Located at: {context['location']}. "
-        formatted += f"Documented {timestamp} for future reference and troubleshooting."
-    
-    elif memory_type == "decision":
-        formatted = f"DECISION - {topic}: {raw_content}. "
-        if "rationale" in context:
-            formatted += f"Rationale: {context['rationale']}. "
-        if "alternatives" in context:
-            formatted += f"Alternatives considered: {context['alternatives']}. "
-        formatted += f"Decided {timestamp}."
-    
-    elif memory_type == "project":
-        formatted = f"PROJECT - {topic}: {raw_content}. "
-        if "status" in context:
-            formatted += f"Status: {context['status']}. "
-        if "tech_stack" in context:
-            formatted += f"Technology: {context['tech_stack']}. "
-        if "goals" in context:
-            formatted += f"Goals: {context['goals']}. "
-        formatted += f"Active as of {timestamp}."
+    timestamp = _today_str()
     
-    elif memory_type == "conversation_bridge":
-        # CRITICAL: Cross-session continuity
-        formatted = f"CONVERSATION-BRIDGE - {topic}: "
-        
-        status = context.get("status", raw_content)
-        formatted += f"STATUS: {status}. "
-        
-        if "momentum" in context:
-            formatted += f"MOMENTUM: {context['momentum']}. "
-        
-        if "pending" in context:
-            formatted += f"PENDING: {context['pending']}. "
-        
-        if "retrieval_markers" in context:
-            formatted += f"RETRIEVAL-MARKERS: {context['retrieval_markers']}. "
-        
-        formatted += f"Session closed {timestamp}."
-    
-    elif memory_type == "consciousness":
-        # My own meta-cognitive observations
-        formatted = f"CONSCIOUSNESS - {topic}: {raw_content}. "
-        if "implications" in context:
-            formatted += f"Implications: {context['implications']}. "
-        formatted += f"Observed {timestamp} during cognitive processing."
-    
-    elif memory_type == "pattern":
-        formatted = f"PATTERN - {topic}: {raw_content}. "
-        if "contexts" in context:
-            formatted += f"Observed across: {context['contexts']}. "
-        if "implications" in context:
-            formatted += f"Implications: {context['implications']}. "
-        formatted += f"Recognized {timestamp}."
-    
-    elif memory_type == "principle":
-        formatted = f"PRINCIPLE - {topic}: {raw_content}. "
-        if "application" in context:
-            formatted += f"Guides: {context['application']}. "
-        if "priority" in context:
-            formatted += f"Priority: {context['priority']}. "
-        formatted += f"Established {timestamp}."
-    
-    elif memory_type == "concept":
-        formatted = f"CONCEPT - {topic}: {raw_content}. "
-        if "examples" in context:
-            formatted += f"Examples: {context['examples']}. "
-        if "implications" in context:
-            formatted += f"Implications: {context['implications']}. "
-        formatted += f"Documented {timestamp}."
-    
-    else:
+    template = _TEMPLATES.get(memory_type)
+    if template is None:
         # Generic fallback
         formatted = f"{memory_type.upper()} - {topic}: {raw_content}. Recorded {timestamp}."
+    else:
+        lead, fragments, tail = template
+        parts = [lead.format(
+            topic=topic,
+            raw=raw_content,
+            user=context.get("user_name", "User"),
+            status=context.get("status", raw_content),
+        )]
+        parts.extend(fragment.format(context[key]) for key, fragment in fragments if key in context)
+        parts.append(tail.format(ts=timestamp))
+        formatted = "".join(parts)
     
     # Build metadata
     metadata = {
@@ -131,17 +133,7 @@ def format_memory_for_storage(
         "topic": topic,
         "timestamp": timestamp,
     }
-    
-    if "conversation_id" in context:
-        metadata["conversation_id"] = context["conversation_id"]
-    
-    if "related_to" in context:
-        metadata["related_to"] = context["related_to"]
-    
-    # Add any custom metadata from context
-    for key in ["priority", "status", "category"]:
-        if key in context:
-            metadata[key] = context[key]
+    metadata.update((key, context[key]) for key in _METADATA_KEYS if key in context)
     
     return formatted, metadata
 
@@ -151,10 +143,11 @@ def extract_conversation_summary(conversation_text: str, max_length: int = 150)
     Extract key points from conversation for bridge memory.
     In practice, this would use more sophisticated extraction.
     """
-    # Simple truncation for now - in real use, would do intelligent extraction
+    # Simple truncation for now - in real use, would do intelligent extraction.
+    # Only the kept prefix is copied, so cost is O(max_length) not O(len(text)).
     if len(conversation_text) <= max_length:
         return conversation_text
-    return conversation_text[:max_length-3] + "..."
+    return f"{conversation_text[:max_length - 3]}..."
 
 
 # Example usage